@@ -1,19 +1,61 @@
 import asyncio
 import os
+from collections.abc import Coroutine
 from pathlib import Path
+from typing import Any
 
+import httpx
 import typer
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 from any_translate.cli.console import console
+from any_translate.models.prompt import SystemPromptBlock
 from any_translate.models.translation import TranslationOptions
 from any_translate.services.file_service import process_srt_file, process_text_file
 from any_translate.services.translation_service import TranslationService
-from any_translate.utils.prompt import get_system_prompt
+from any_translate.utils.prompt import get_system_prompt, get_system_prompt_blocks
 
 app = typer.Typer(help="A tool for translating subtitle and text files using OpenAI API")
 
 
+def create_openai_client(api_key: str, base_url: str | None, max_requests: int) -> AsyncOpenAI:
+    """
+    Create an OpenAI async client backed by a pooled, keep-alive HTTP client
+
+    Args:
+        api_key: OpenAI API key
+        base_url: OpenAI API base URL (None to use the default)
+        max_requests: Maximum number of in-flight requests (used to size the connection pool)
+
+    Returns:
+        OpenAI async client instance
+    """
+    pool_size = max(100, max_requests)
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=120,
+        ),
+        timeout=httpx.Timeout(120.0, connect=10.0),
+    )
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+
+async def run_with_client(client: AsyncOpenAI, coroutine: Coroutine[Any, Any, None]) -> None:
+    """
+    Run a coroutine and close the OpenAI client's connection pool afterwards
+
+    Args:
+        client: OpenAI async client used by the coroutine
+        coroutine: Coroutine to run
+    """
+    try:
+        await coroutine
+    finally:
+        await client.close()
+
+
 @app.command("translate")
 def translate(
     input_file: Path = typer.Argument(..., help="Input SRT file path", exists=True, dir_okay=False, resolve_path=True),
@@ -32,6 +74,21 @@ def translate(
     sessions: int = typer.Option(
         1, "--sessions", "-n", help="Number of sessions to process simultaneously (default: 1)"
     ),
+    concurrency: int = typer.Option(
+        32, "--concurrency", "-c", min=1, help="Maximum number of concurrent requests per session (default: 32)"
+    ),
+    batch_size: int = typer.Option(
+        10, "--batch-size", "-b", min=1, help="Number of lines translated together in a single request (default: 10)"
+    ),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Print every original and translated line"),
+    prompt_cache: bool = typer.Option(
+        False,
+        "--prompt-cache",
+        help=(
+            "Send the system prompt as content blocks with an Anthropic-style cache_control breakpoint. "
+            "Only for compatible proxies or endpoints; the OpenAI API does not support it"
+        ),
+    ),
     temperature: float = typer.Option(1.0, "--temperature", "-T", help="Model temperature value (default: 1.0)"),
     tone: str = typer.Option(
         "auto-contextual",
@@ -68,18 +125,31 @@ def translate(
         temperature=temperature,
         tone=tone,  # type: ignore
         sessions=sessions,
+        concurrency=concurrency,
+        batch_size=batch_size,
+        verbose=verbose,
+        prompt_cache=prompt_cache,
     )
 
     # Generate system prompt
-    system_prompt = get_system_prompt(
-        target_lang=options.target_lang,
-        tone=options.tone,
-        system_prompt_file=system_prompt_file,
-        additional_prompt=additional_prompt,
-    )
+    system_prompt: str | list[SystemPromptBlock]
+    if options.prompt_cache:
+        system_prompt = get_system_prompt_blocks(
+            target_lang=options.target_lang,
+            tone=options.tone,
+            system_prompt_file=system_prompt_file,
+            additional_prompt=additional_prompt,
+        )
+    else:
+        system_prompt = get_system_prompt(
+            target_lang=options.target_lang,
+            tone=options.tone,
+            system_prompt_file=system_prompt_file,
+            additional_prompt=additional_prompt,
+        )
 
     # Create OpenAI client
-    client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+    client = create_openai_client(api_key, base_url, options.sessions * options.concurrency)
 
     # Create translation service
     translation_service = TranslationService(
@@ -97,12 +167,29 @@ def translate(
     console.print(f"[bold]Target language:[/bold] {options.target_lang}")
     console.print(f"[bold]Model:[/bold] {options.model}")
     console.print(f"[bold]Number of sessions:[/bold] {options.sessions}")
+    console.print(f"[bold]Concurrency per session:[/bold] {options.concurrency}")
+    console.print(f"[bold]Batch size:[/bold] {options.batch_size}")
     console.print(f"[bold]Translation tone:[/bold] {options.tone}")
+    if options.prompt_cache:
+        console.print("[bold]Prompt cache:[/bold] enabled")
     if base_url:
         console.print(f"[bold]Base URL:[/bold] {base_url}")
 
     try:
-        asyncio.run(process_srt_file(input_file, output_file, translation_service, options.sessions))
+        asyncio.run(
+            run_with_client(
+                client,
+                process_srt_file(
+                    input_file,
+                    output_file,
+                    translation_service,
+                    options.sessions,
+                    options.concurrency,
+                    options.batch_size,
+                    options.verbose,
+                ),
+            )
+        )
     except Exception as e:
         console.print(f"[bold red]Error occurred:[/bold red] {e}")
         raise typer.Exit(code=1)
@@ -128,6 +215,21 @@ def translate_text(
     sessions: int = typer.Option(
         1, "--sessions", "-n", help="Number of sessions to process simultaneously (default: 1)"
     ),
+    concurrency: int = typer.Option(
+        32, "--concurrency", "-c", min=1, help="Maximum number of concurrent requests per session (default: 32)"
+    ),
+    batch_size: int = typer.Option(
+        10, "--batch-size", "-b", min=1, help="Number of lines translated together in a single request (default: 10)"
+    ),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Print every original and translated line"),
+    prompt_cache: bool = typer.Option(
+        False,
+        "--prompt-cache",
+        help=(
+            "Send the system prompt as content blocks with an Anthropic-style cache_control breakpoint. "
+            "Only for compatible proxies or endpoints; the OpenAI API does not support it"
+        ),
+    ),
     temperature: float = typer.Option(1.0, "--temperature", "-T", help="Model temperature value (default: 1.0)"),
     tone: str = typer.Option(
         "auto-contextual",
@@ -164,18 +266,31 @@ def translate_text(
         temperature=temperature,
         tone=tone,  # type: ignore
         sessions=sessions,
+        concurrency=concurrency,
+        batch_size=batch_size,
+        verbose=verbose,
+        prompt_cache=prompt_cache,
     )
 
     # Generate system prompt
-    system_prompt = get_system_prompt(
-        target_lang=options.target_lang,
-        tone=options.tone,
-        system_prompt_file=system_prompt_file,
-        additional_prompt=additional_prompt,
-    )
+    system_prompt: str | list[SystemPromptBlock]
+    if options.prompt_cache:
+        system_prompt = get_system_prompt_blocks(
+            target_lang=options.target_lang,
+            tone=options.tone,
+            system_prompt_file=system_prompt_file,
+            additional_prompt=additional_prompt,
+        )
+    else:
+        system_prompt = get_system_prompt(
+            target_lang=options.target_lang,
+            tone=options.tone,
+            system_prompt_file=system_prompt_file,
+            additional_prompt=additional_prompt,
+        )
 
     # Create OpenAI client
-    client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+    client = create_openai_client(api_key, base_url, options.sessions * options.concurrency)
 
     # Create translation service
     translation_service = TranslationService(
@@ -193,12 +308,29 @@ def translate_text(
     console.print(f"[bold]Target language:[/bold] {options.target_lang}")
     console.print(f"[bold]Model:[/bold] {options.model}")
     console.print(f"[bold]Number of sessions:[/bold] {options.sessions}")
+    console.print(f"[bold]Concurrency per session:[/bold] {options.concurrency}")
+    console.print(f"[bold]Batch size:[/bold] {options.batch_size}")
     console.print(f"[bold]Translation tone:[/bold] {options.tone}")
+    if options.prompt_cache:
+        console.print("[bold]Prompt cache:[/bold] enabled")
     if base_url:
         console.print(f"[bold]Base URL:[/bold] {base_url}")
 
     try:
-        asyncio.run(process_text_file(input_file, output_file, translation_service, options.sessions))
+        asyncio.run(
+            run_with_client(
+                client,
+                process_text_file(
+                    input_file,
+                    output_file,
+                    translation_service,
+                    options.sessions,
+                    options.concurrency,
+                    options.batch_size,
+                    options.verbose,
+                ),
+            )
+        )
     except Exception as e:
         console.print(f"[bold red]Error occurred:[/bold red] {e}")
         raise typer.Exit(code=1)
@@ -1,6 +1,9 @@
+from any_translate.models.prompt import CacheControl as CacheControl
+from any_translate.models.prompt import SystemPromptBlock as SystemPromptBlock
 from any_translate.models.subtitle import Subtitle as Subtitle
 from any_translate.models.subtitle import subtitles_to_dict as subtitles_to_dict
 from any_translate.models.subtitle import subtitles_to_json as subtitles_to_json
+from any_translate.models.translation import BatchTranslationSchema as BatchTranslationSchema
 from any_translate.models.translation import TranslationOptions as TranslationOptions
 from any_translate.models.translation import TranslationResult as TranslationResult
 from any_translate.models.translation import TranslationSchema as TranslationSchema
@@ -0,0 +1,15 @@
+from typing import Literal, NotRequired, TypedDict
+
+
+class CacheControl(TypedDict):
+    """TypedDict marking a prompt cache breakpoint"""
+
+    type: Literal["ephemeral"]
+
+
+class SystemPromptBlock(TypedDict):
+    """TypedDict containing a text block of the system prompt"""
+
+    type: Literal["text"]
+    text: str
+    cache_control: NotRequired[CacheControl]
@@ -1,3 +1,4 @@
+import functools
 from typing import TypedDict
 
 from pydantic import BaseModel, Field, TypeAdapter
@@ -18,6 +19,34 @@ class Subtitle(BaseModel):
     end: str = Field(examples=["00:00:00,000"])
     text: str = Field(examples=["Hello world"])
 
+    @property
+    def start_ms(self) -> int:
+        """Start time in milliseconds, derived from start"""
+        return _time_to_milliseconds(self.start)
+
+    @property
+    def end_ms(self) -> int:
+        """End time in milliseconds, derived from end"""
+        return _time_to_milliseconds(self.end)
+
+
+@functools.lru_cache(maxsize=4096)
+def _time_to_milliseconds(time_str: str) -> int:
+    """
+    Convert an HH:MM:SS,mmm time string to milliseconds ("." is accepted as well, and the fraction is optional)
+
+    Results are cached, since the same boundary times recur across many subtitles.
+
+    Args:
+        time_str: Time string in HH:MM:SS,mmm format
+
+    Returns:
+        Number of milliseconds
+    """
+    clock, _, milliseconds = time_str.replace(".", ",").partition(",")
+    hours, minutes, seconds = clock.split(":")
+    return ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(milliseconds or 0)
+
 
 SubtitleList = TypeAdapter(list[Subtitle])
 
@@ -29,4 +58,4 @@ def subtitles_to_dict(subtitles: list[Subtitle]) -> list[SubtitleTypedDict]:
 
 def subtitles_to_json(subtitles: list[Subtitle]) -> str:
     """Convert a list of subtitle objects to a JSON string"""
-    return str(SubtitleList.dump_json(subtitles))
+    return SubtitleList.dump_json(subtitles).decode("utf-8")
@@ -25,6 +25,12 @@ class TranslationSchema(BaseModel):
         return cast(TranslationResult, self.model_dump(mode="python"))
 
 
+class BatchTranslationSchema(BaseModel):
+    """Pydantic model containing the results of a batch translation"""
+
+    translations: list[TranslationSchema] = Field(description="Translations in the order of the original sentences")
+
+
 @dataclass
 class TranslationOptions:
     """
@@ -37,3 +43,7 @@ class TranslationOptions:
     temperature: float = 1.0
     tone: Literal["formal", "informal", "auto-contextual"] = "auto-contextual"
     sessions: int = 1
+    concurrency: int = 32
+    batch_size: int = 10
+    verbose: bool = False
+    prompt_cache: bool = False
@@ -1,6 +1,6 @@
 import asyncio
 import math
-import textwrap
+from itertools import batched
 from pathlib import Path
 
 from rich.progress import BarColumn, Progress, TextColumn, TimeElapsedColumn, TimeRemainingColumn
@@ -10,12 +10,17 @@ from any_translate.models.subtitle import Subtitle
 from any_translate.services.translation_service import TranslationService
 from any_translate.utils.srt import save_subtitles_to_srt, srt_file_to_subtitles
 
+SEPARATOR = "=" * 40
+
 
 async def process_srt_file(
     input_path: Path,
     output_path: Path,
     translation_service: TranslationService,
     sessions: int = 1,
+    concurrency: int = 32,
+    batch_size: int = 10,
+    verbose: bool = False,
 ) -> None:
     """
     Process SRT file
@@ -23,8 +28,11 @@ async def process_srt_file(
     Args:
         input_path: Input file path
         output_path: Output file path
-        translation_service: Translation service instance
+        translation_service: Translation service instance (shared by all sessions)
         sessions: Number of concurrent sessions
+        concurrency: Maximum number of in-flight translation requests per session
+        batch_size: Number of items translated together in a single request
+        verbose: Whether to print every original and translated item
     """
     # Load SRT file
     subtitles = srt_file_to_subtitles(input_path)
@@ -36,19 +44,8 @@ async def process_srt_file(
     groups: list[list[Subtitle]] = [subtitles[i * group_size : (i + 1) * group_size] for i in range(sessions)]
     # Calculate starting index for each group to maintain global order (starting from 1)
     group_starts: list[int] = [i * group_size + 1 for i in range(sessions)]
-
-    # Create independent TranslationService instances for each session (different contexts)
-    translation_services: list[TranslationService] = [
-        TranslationService(
-            openai_client=translation_service.client,
-            model_names=translation_service.model_names,
-            system_prompt=translation_service.system_prompt,
-            additional_prompt=translation_service.additional_prompt,
-            target_lang=translation_service.target_lang,
-            max_tokens=translation_service.max_tokens,
-        )
-        for _ in range(sessions)
-    ]
+    # Results are written in place by global index; original subtitles are kept in case of error
+    translated_subtitles: list[Subtitle] = list(subtitles)
 
     # Use a single Progress for progress display
     with Progress(
@@ -61,70 +58,50 @@ async def process_srt_file(
     ) as progress:
         task = progress.add_task("Translating", total=total_subtitles)
 
-        # Return results from each session as a list of tuples: (global_index, translated_subtitle)
-        async def process_session(
-            session_start: int, subtitles_subset: list[Subtitle], ts: TranslationService
-        ) -> list[tuple[int, Subtitle]]:
+        async def process_session(session_start: int, subtitles_subset: list[Subtitle]) -> None:
             """
             Process a subset of subtitles in a session
 
             Args:
                 session_start: Starting index for this session
                 subtitles_subset: Subset of subtitles to process
-                ts: Translation service instance for this session
-
-            Returns:
-                List of tuples containing (original_index, translated_subtitle)
             """
-            session_results: list[tuple[int, Subtitle]] = []
-            for local_idx, subtitle in enumerate(subtitles_subset):
-                global_idx = session_start + local_idx
-                try:
-                    result = await ts.translate_sentence(subtitle.text)
-                    console.print(
-                        textwrap.dedent(f"""
-                    ========================================
-                    Session {global_idx}
-
-                    Original:
-                    {subtitle.text}
-
-                    Translated:
-                    {result["translated_text"]}
-                    """).strip()
-                    )
-                    # Create translated subtitle
-                    translated_subtitle = Subtitle(
-                        index=subtitle.index,
-                        start=subtitle.start,
-                        end=subtitle.end,
-                        text=result["translated_text"],
-                    )
-                    # Store global index and translation result together
-                    session_results.append((global_idx, translated_subtitle))
-                except Exception as e:
-                    console.print("Error processing subtitle:")
-                    console.print(subtitle.text)
-                    console.print(e)
-                    # Keep original subtitle in case of error
-                    session_results.append((global_idx, subtitle))
-                console.print()  # Empty line for separation
-                progress.advance(task, 1)
-            return session_results
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def process_batch(batch_start: int, batch: tuple[Subtitle, ...]) -> None:
+                async with semaphore:
+                    try:
+                        results = await translation_service.translate_batch([subtitle.text for subtitle in batch])
+                        # Create translated subtitles
+                        batch_subtitles = [
+                            subtitle.model_copy(update={"text": result["translated_text"]})
+                            for subtitle, result in zip(batch, results, strict=True)
+                        ]
+                        if verbose:
+                            for offset, (subtitle, translated) in enumerate(zip(batch, batch_subtitles)):
+                                console.print(
+                                    f"{SEPARATOR}\nSession {batch_start + offset}\n\n"
+                                    f"Original:\n{subtitle.text}\n\nTranslated:\n{translated.text}\n"
+                                )
+                        # Store translation results at their global positions
+                        translated_subtitles[batch_start - 1 : batch_start - 1 + len(batch)] = batch_subtitles
+                    except Exception as e:
+                        console.print("Error processing subtitles:")
+                        for subtitle in batch:
+                            console.print(subtitle.text)
+                        console.print(e)
+                        console.print()  # Empty line for separation
+                progress.advance(task, len(batch))
+
+            # Translate all batches of the session concurrently, bounded by the semaphore
+            await asyncio.gather(*[
+                process_batch(session_start + batch_idx * batch_size, batch)
+                for batch_idx, batch in enumerate(batched(subtitles_subset, batch_size))
+            ])
 
         # Create async tasks for each session
-        tasks = [process_session(group_starts[i], groups[i], translation_services[i]) for i in range(sessions)]
-        session_results_lists: list[list[tuple[int, Subtitle]]] = await asyncio.gather(*tasks)
-
-    # Combine results from all sessions
-    all_results: list[tuple[int, Subtitle]] = []
-    for res in session_results_lists:
-        all_results.extend(res)
-    # Sort by global index to maintain original subtitle order
-    all_results.sort(key=lambda x: x[0])
-
-    # Create list of translated subtitles
-    translated_subtitles = [subtitle for _, subtitle in all_results]
+        tasks = [process_session(group_starts[i], groups[i]) for i in range(sessions)]
+        await asyncio.gather(*tasks)
 
     # Save translated subtitles to SRT file
     save_subtitles_to_srt(translated_subtitles, output_path)
@@ -136,6 +113,9 @@ async def process_text_file(
     output_path: Path,
     translation_service: TranslationService,
     sessions: int = 1,
+    concurrency: int = 32,
+    batch_size: int = 10,
+    verbose: bool = False,
 ) -> None:
     """
     Process text file
@@ -143,14 +123,15 @@ async def process_text_file(
     Args:
         input_path: Input file path
         output_path: Output file path
-        translation_service: Translation service instance
+        translation_service: Translation service instance (shared by all sessions)
         sessions: Number of concurrent sessions
+        concurrency: Maximum number of in-flight translation requests per session
+        batch_size: Number of items translated together in a single request
+        verbose: Whether to print every original and translated item
     """
+    # Simple sentence splitting (by newline), reading the file line by line
     with input_path.open("r", encoding="utf-8") as f:
-        text = f.read()
-
-    # Simple sentence splitting (by newline)
-    sentences = [s.strip() + "\n" for s in text.split("\n") if s.strip()]
+        sentences = [stripped for line in f if (stripped := line.strip())]
     total_sentences = len(sentences)
     console.print(f"Total number of sentences: {total_sentences}")
 
@@ -159,19 +140,8 @@ async def process_text_file(
     groups: list[list[str]] = [sentences[i * group_size : (i + 1) * group_size] for i in range(sessions)]
     # Calculate starting index for each group to maintain global order (starting from 1)
     group_starts: list[int] = [i * group_size + 1 for i in range(sessions)]
-
-    # Create independent TranslationService instances for each session (different contexts)
-    translation_services: list[TranslationService] = [
-        TranslationService(
-            openai_client=translation_service.client,
-            model_names=translation_service.model_names,
-            system_prompt=translation_service.system_prompt,
-            additional_prompt=translation_service.additional_prompt,
-            target_lang=translation_service.target_lang,
-            max_tokens=translation_service.max_tokens,
-        )
-        for _ in range(sessions)
-    ]
+    # Results are written in place by global index
+    translated_texts: list[str] = [""] * total_sentences
 
     # Use a single Progress for progress display
     with Progress(
@@ -184,56 +154,46 @@ async def process_text_file(
     ) as progress:
         task = progress.add_task("Translating", total=total_sentences)
 
-        # Return results from each session as a list of tuples: (global_index, translated_sentence)
-        async def process_session(
-            session_start: int, sentences_subset: list[str], ts: TranslationService
-        ) -> list[tuple[int, str]]:
+        async def process_session(session_start: int, sentences_subset: list[str]) -> None:
             """
             Process a subset of sentences in a session
 
             Args:
                 session_start: Starting index for this session
                 sentences_subset: Subset of sentences to process
-                ts: Translation service instance for this session
-
-            Returns:
-                List of tuples containing (original_index, translated_sentence)
             """
-            session_results: list[tuple[int, str]] = []
-            for local_idx, sentence in enumerate(sentences_subset):
-                global_idx = session_start + local_idx
-                console.print("=" * 40)
-                console.print(f"Session {global_idx}")
-                console.print("Translating:")
-                console.print(sentence)
-                try:
-                    result = await ts.translate_sentence(sentence)
-                    # Store global index and translation result together
-                    session_results.append((global_idx, result["translated_text"]))
-                except Exception as e:
-                    console.print("Error processing sentence:")
-                    console.print(sentence)
-                    console.print(e)
-                    session_results.append((global_idx, f"Error: {e}"))
-                console.print()  # Empty line for separation
-                progress.advance(task, 1)
-            return session_results
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def process_batch(batch_start: int, batch: tuple[str, ...]) -> None:
+                async with semaphore:
+                    if verbose:
+                        for offset, sentence in enumerate(batch):
+                            console.print(f"{SEPARATOR}\nSession {batch_start + offset}\nTranslating:\n{sentence}\n")
+                    try:
+                        results = await translation_service.translate_batch(list(batch))
+                        batch_texts = [result["translated_text"] for result in results]
+                    except Exception as e:
+                        console.print("Error processing sentences:")
+                        for sentence in batch:
+                            console.print(sentence)
+                        console.print(e)
+                        console.print()  # Empty line for separation
+                        batch_texts = [f"Error: {e}"] * len(batch)
+                # Store translation results at their global positions
+                translated_texts[batch_start - 1 : batch_start - 1 + len(batch)] = batch_texts
+                progress.advance(task, len(batch))
+
+            # Translate all batches of the session concurrently, bounded by the semaphore
+            await asyncio.gather(*[
+                process_batch(session_start + batch_idx * batch_size, batch)
+                for batch_idx, batch in enumerate(batched(sentences_subset, batch_size))
+            ])
 
         # Create async tasks for each session
-        tasks = [process_session(group_starts[i], groups[i], translation_services[i]) for i in range(sessions)]
-        session_results_lists: list[list[tuple[int, str]]] = await asyncio.gather(*tasks)
-
-    # Combine results from all sessions
-    all_results: list[tuple[int, str]] = []
-    for res in session_results_lists:
-        all_results.extend(res)
-    # Sort by global index to maintain original sentence order
-    all_results.sort(key=lambda x: x[0])
+        tasks = [process_session(group_starts[i], groups[i]) for i in range(sessions)]
+        await asyncio.gather(*tasks)
 
     # Write results to output file after all processing is complete
-    with output_path.open("w", encoding="utf-8") as out_file:
-        for _, translated_text in all_results:
-            out_file.write(translated_text + "\n")
-            out_file.flush()
+    output_path.write_text("".join(f"{translated_text}\n" for translated_text in translated_texts), encoding="utf-8")
 
     console.print(f"Translation completed: {output_path}")
@@ -1,15 +1,122 @@
+import asyncio
+import functools
 import json
 import textwrap
-from typing import Any, cast
+from collections.abc import Coroutine
+from typing import Any, TypeVar, cast
 
 import tiktoken
-from openai import AsyncOpenAI, RateLimitError
+from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
 from openai.types.chat import ChatCompletionMessageParam
-from pydantic import ValidationError
+from openai.types.chat.completion_create_params import ResponseFormat
+from pydantic import BaseModel, ValidationError
 from rich import print
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_fixed
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
-from any_translate.models.translation import TranslationResult, TranslationSchema
+from any_translate.models.prompt import SystemPromptBlock
+from any_translate.models.translation import BatchTranslationSchema, TranslationResult, TranslationSchema
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+class TranslationCountMismatchError(Exception):
+    """Raised when a batch response does not contain exactly one translation per sentence"""
+
+
+# Retry rate limits, transient API failures and malformed responses with randomized exponential backoff
+translation_retry = retry(
+    stop=stop_after_attempt(6),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    retry=retry_if_exception_type((
+        RateLimitError,
+        APITimeoutError,
+        APIConnectionError,
+        InternalServerError,
+        ValidationError,
+        ValueError,
+        TimeoutError,
+    )),
+    reraise=True,
+)
+
+TRANSLATION_JSON_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "source_lang": {
+            "type": "string",
+            "description": "The source language of the text.",
+        },
+        "translated_text": {
+            "type": "string",
+            "description": "The text after being translated.",
+        },
+    },
+    "required": ["source_lang", "translated_text"],
+    "additionalProperties": False,
+}
+
+TRANSLATION_RESPONSE_FORMAT: ResponseFormat = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "translation_schema",
+        "schema": TRANSLATION_JSON_SCHEMA,
+        "strict": True,
+    },
+}
+
+BATCH_TRANSLATION_RESPONSE_FORMAT: ResponseFormat = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "batch_translation_schema",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "translations": {
+                    "type": "array",
+                    "description": "Translations in the same order as the original sentences.",
+                    "items": TRANSLATION_JSON_SCHEMA,
+                },
+            },
+            "required": ["translations"],
+            "additionalProperties": False,
+        },
+        "strict": True,
+    },
+}
+
+SENTENCE_QUERY_TEMPLATE = textwrap.dedent("""
+    Translate the following sentence to {target_lang}.
+    Make sure your response should follow the JSON format of:
+    {{"source_lang": "EN","translated_text": "Translated text"}}
+
+    {additional_prompt}
+
+    Original:
+    """)
+
+BATCH_QUERY_TEMPLATE = textwrap.dedent("""
+    Translate each sentence of the following JSON array to {target_lang}.
+    Make sure your response should follow the JSON format of:
+    {{"translations": [{{"source_lang": "EN","translated_text": "Translated text"}}, ...]}}
+    with exactly one translation per sentence, in the same order.
+
+    {additional_prompt}
+
+    Originals:
+    """)
+
+QUERY_SUFFIX = "\n\nMAKE SURE TO FOLLOW THE JSON FORMAT.\n"
+
+
+@functools.cache
+def get_encoding() -> tiktoken.Encoding:
+    """
+    Get the tokenizer used for counting tokens, loading it only once per process
+
+    Returns:
+        tiktoken encoding
+    """
+    return tiktoken.get_encoding("cl100k_base")
 
 
 class TranslationService:
@@ -23,7 +130,7 @@ class TranslationService:
         self,
         openai_client: AsyncOpenAI,
         model_names: list[str],
-        system_prompt: str,
+        system_prompt: str | list[SystemPromptBlock],
         target_lang: str,
         additional_prompt: str | None = None,
         max_tokens: int = 1024,
@@ -34,8 +141,9 @@ class TranslationService:
         Args:
             openai_client: Injected OpenAI async client instance
             model_names: List of available model names (tried in order of priority)
-            system_prompt: System prompt string (for providing translation guidelines)
-            max_tokens: Maximum number of tokens (default: 4096)
+            system_prompt: System prompt string or text blocks with cache_control breakpoints
+                (for providing translation guidelines)
+            max_tokens: Maximum number of sentence tokens sent in a single batch request (default: 1024)
         """
         self.client = openai_client
         self.model_names = model_names
@@ -43,156 +151,237 @@ class TranslationService:
         self.target_lang = target_lang
         self.additional_prompt = additional_prompt
         self.max_tokens = max_tokens
-        self.history: list[ChatCompletionMessageParam] = []
-        self.encoding = tiktoken.get_encoding("cl100k_base")
+        self.encoding = get_encoding()
+        # Static parts of each request, built once so that only the sentences change per call
+        self._system_message = cast(ChatCompletionMessageParam, {"role": "system", "content": system_prompt})
+        self._sentence_query_prefix = SENTENCE_QUERY_TEMPLATE.format(
+            target_lang=target_lang, additional_prompt=additional_prompt
+        )
+        self._batch_query_prefix = BATCH_QUERY_TEMPLATE.format(
+            target_lang=target_lang, additional_prompt=additional_prompt
+        )
+        self._cache: dict[tuple[str, str], asyncio.Future[TranslationResult]] = {}
 
-    def count_tokens(self, messages: list[ChatCompletionMessageParam]) -> int:
+    def split_by_token_budget(self, sentences: list[str]) -> list[list[str]]:
         """
-        Count the number of tokens in the messages
+        Split sentences into consecutive groups whose token count stays within max_tokens
+
+        All sentences are tokenized once in a single batch and the size of the current group is kept as
+        a running total. A sentence that exceeds the budget on its own forms a group by itself.
 
         Args:
-            messages: List of chat completion messages
+            sentences: Sentences to split
 
         Returns:
-            Number of tokens
+            Groups of sentences in their original order
         """
-        return sum(len(self.encoding.encode(cast(str, msg.get("content", "")))) for msg in messages)
+        if not sentences:
+            return []
+        # Every token covers at least one byte, so input that fits the budget in bytes needs no tokenizing
+        if sum(len(sentence.encode("utf-8")) for sentence in sentences) <= self.max_tokens:
+            return [sentences]
 
-    async def _attempt_translation(self, messages: list[ChatCompletionMessageParam], model: str) -> str:
+        groups: list[list[str]] = []
+        group_tokens = 0
+        for sentence, tokens in zip(sentences, self.encoding.encode_batch(sentences), strict=True):
+            token_count = len(tokens)
+            if not groups or group_tokens + token_count > self.max_tokens:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append(sentence)
+            group_tokens += token_count
+        return groups
+
+    async def _attempt_translation(
+        self, messages: list[ChatCompletionMessageParam], model: str, response_format: ResponseFormat
+    ) -> str:
         """
         Attempt to translate using the specified model
 
         Args:
             messages: List of chat completion messages
             model: Model name to use
+            response_format: Structured output format the response must follow
 
         Returns:
             JSON string containing the translation result
         """
-        stream = await self.client.chat.completions.create(
+        response = await self.client.chat.completions.create(
             model=model,
             messages=messages,
             timeout=120,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "translation_schema",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "source_lang": {
-                                "type": "string",
-                                "description": "The source language of the text.",
-                            },
-                            "translated_text": {
-                                "type": "string",
-                                "description": "The text after being translated.",
-                            },
-                        },
-                        "required": ["source_lang", "translated_text"],
-                        "additionalProperties": False,
-                    },
-                    "strict": True,
-                },
-            },
-            stream=True,
+            response_format=response_format,
         )
-        full_content = ""
-        async for chunk in stream:
-            delta = chunk.choices[0].delta
-            if delta.content:
-                full_content += delta.content
-        return full_content
-
-    @retry(
-        stop=stop_after_attempt(5),
-        retry=retry_if_exception_type((
-            json.JSONDecodeError,
-            ValidationError,
-            ValueError,
-            TimeoutError,
-        )),
-        reraise=True,
-    )
-    @retry(
-        stop=stop_after_attempt(300),
-        retry=retry_if_exception_type((RateLimitError,)),
-        wait=wait_fixed(1),
-        reraise=True,
-    )
+        return response.choices[0].message.content or ""
+
     async def translate_sentence(self, sentence: str) -> TranslationResult:
         """
         Translate a single sentence
 
+        Results are memoized by (sentence, target language), and concurrent requests for the same
+        sentence share a single API call.
+
         Args:
             sentence: Sentence to translate
 
         Returns:
             Translation result containing source language and translated text
         """
-        translate_query = textwrap.dedent(f"""
-        Translate the following sentence to {self.target_lang}.
-        Make sure your response should follow the JSON format of:
-        {{"source_lang": "EN","translated_text": "Translated text"}}
+        key = (sentence, self.target_lang)
+        if key not in self._cache:
+            self._schedule(sentence, self._translate_sentence(sentence))
+        # Shield the shared translation so that one cancelled caller does not cancel it for the others
+        return await asyncio.shield(self._cache[key])
 
-        {self.additional_prompt}
+    async def translate_batch(self, sentences: list[str]) -> list[TranslationResult]:
+        """
+        Translate multiple sentences, sending the ones that are not cached yet in as few requests as
+        the token budget allows, one request at a time
+
+        Args:
+            sentences: Sentences to translate
+
+        Returns:
+            Translation results in the same order as the given sentences
+        """
+        misses = [sentence for sentence in dict.fromkeys(sentences) if (sentence, self.target_lang) not in self._cache]
+        # Groups are chained so that a single call never has more than one request in flight
+        previous_group: asyncio.Future[list[TranslationResult]] | None = None
+        for group in self.split_by_token_budget(misses):
+            translation = asyncio.ensure_future(self._translate_group(group, previous_group))
+            for index, sentence in enumerate(group):
+                self._schedule(sentence, self._batch_item(translation, index))
+            previous_group = translation
+        return await asyncio.gather(*[
+            asyncio.shield(self._cache[(sentence, self.target_lang)]) for sentence in sentences
+        ])
 
-        Original:
-        {sentence}
+    async def _translate_group(
+        self, sentences: list[str], previous_group: asyncio.Future[list[TranslationResult]] | None
+    ) -> list[TranslationResult]:
+        """
+        Translate a group of sentences once the previous group of the same call has finished
 
-        MAKE SURE TO FOLLOW THE JSON FORMAT.
-        """)
-        current_messages: list[ChatCompletionMessageParam] = (
-            [cast(ChatCompletionMessageParam, {"role": "system", "content": self.system_prompt})]
-            + self.history
-            + [cast(ChatCompletionMessageParam, {"role": "user", "content": translate_query})]
+        Args:
+            sentences: Sentences to translate
+            previous_group: Translation of the previous group, whose outcome does not matter (None for the first)
+
+        Returns:
+            Translation results in the same order as the given sentences
+        """
+        if previous_group is not None:
+            await asyncio.wait([previous_group])
+        if len(sentences) == 1:
+            return [await self._translate_sentence(sentences[0])]
+        try:
+            return await self._translate_batch(sentences)
+        except TranslationCountMismatchError as e:
+            # Resending the same batch tends to merge or split lines again, so translate them one by one
+            print(f"{e}, translating the sentences one by one...", flush=True)
+            return [await self._translate_sentence(sentence) for sentence in sentences]
+
+    @staticmethod
+    async def _batch_item(batch: asyncio.Future[list[TranslationResult]], index: int) -> TranslationResult:
+        """
+        Wait for a batch translation and pick a single result from it
+
+        Args:
+            batch: Batch translation future
+            index: Index of the result to pick
+
+        Returns:
+            Translation result at the given index
+        """
+        return (await batch)[index]
+
+    def _schedule(self, sentence: str, translation: Coroutine[Any, Any, TranslationResult]) -> None:
+        """
+        Start a translation and register it in the cache
+
+        Args:
+            sentence: Sentence being translated
+            translation: Coroutine producing the translation result
+        """
+        key = (sentence, self.target_lang)
+        future = asyncio.ensure_future(translation)
+        future.add_done_callback(functools.partial(self._forget_failed, key))
+        self._cache[key] = future
+
+    def _forget_failed(self, key: tuple[str, str], future: asyncio.Future[TranslationResult]) -> None:
+        """
+        Remove a failed translation from the cache so that it can be retried later
+
+        Args:
+            key: Cache key of the translation
+            future: Finished translation future
+        """
+        if future.cancelled() or future.exception() is not None:
+            self._cache.pop(key, None)
+
+    @translation_retry
+    async def _translate_sentence(self, sentence: str) -> TranslationResult:
+        """
+        Translate a single sentence without consulting the cache
+
+        Args:
+            sentence: Sentence to translate
+
+        Returns:
+            Translation result containing source language and translated text
+        """
+        translate_query = self._sentence_query_prefix + sentence + QUERY_SUFFIX
+        translation = await self._request_translation(translate_query, TRANSLATION_RESPONSE_FORMAT, TranslationSchema)
+        return translation.to_result()
+
+    @translation_retry
+    async def _translate_batch(self, sentences: list[str]) -> list[TranslationResult]:
+        """
+        Translate multiple sentences in a single request without consulting the cache
+
+        Args:
+            sentences: Sentences to translate
+
+        Returns:
+            Translation results in the same order as the given sentences
+        """
+        translate_query = self._batch_query_prefix + json.dumps(sentences, ensure_ascii=False, indent=2) + QUERY_SUFFIX
+        batch = await self._request_translation(
+            translate_query, BATCH_TRANSLATION_RESPONSE_FORMAT, BatchTranslationSchema
         )
+        if len(batch.translations) != len(sentences):
+            raise TranslationCountMismatchError(
+                f"Expected {len(sentences)} translations, got {len(batch.translations)}"
+            )
+        return [translation.to_result() for translation in batch.translations]
+
+    async def _request_translation(
+        self, translate_query: str, response_format: ResponseFormat, schema: type[SchemaT]
+    ) -> SchemaT:
+        """
+        Request a translation, trying each model in order of priority
+
+        Args:
+            translate_query: User message asking for the translation
+            response_format: Structured output format the response must follow
+            schema: Pydantic model used to validate the response
 
-        # If token count exceeds the maximum, reduce conversation history
-        while self.count_tokens(current_messages) > self.max_tokens:
-            if len(self.history) > 1:
-                self.history.pop(0)
-                current_messages = (
-                    [cast(ChatCompletionMessageParam, {"role": "system", "content": self.system_prompt})]
-                    + self.history
-                    + [cast(ChatCompletionMessageParam, {"role": "user", "content": translate_query})]
-                )
-            else:
-                break
+        Returns:
+            Validated translation response
+        """
+        current_messages: list[ChatCompletionMessageParam] = [
+            self._system_message,
+            cast(ChatCompletionMessageParam, {"role": "user", "content": translate_query}),
+        ]
 
         last_error: Exception | None = None
         for model in self.model_names:
             try:
-                response_text = await self._attempt_translation(current_messages, model)
-                result: dict[str, Any] = json.loads(response_text)
-                TranslationSchema.model_validate(result)
-                self.history.append(
-                    cast(ChatCompletionMessageParam, {"role": "assistant", "content": json.dumps(result)})
-                )
-                return cast(TranslationResult, result)
-            except (json.JSONDecodeError, ValidationError) as e:
-                self.history.append(cast(ChatCompletionMessageParam, {"role": "assistant", "content": response_text}))
-                self.history.append(
-                    cast(
-                        ChatCompletionMessageParam,
-                        {
-                            "role": "user",
-                            "content": "No, you should follow the JSON format of "
-                            "{'source_lang': 'EN', 'translated_text': 'Translated text'}",
-                        },
-                    )
-                )
-                self.history.append(
-                    cast(
-                        ChatCompletionMessageParam,
-                        {
-                            "role": "assistant",
-                            "content": "Got it. I will follow the JSON format of "
-                            "{'source_lang': 'EN', 'translated_text': 'Translated text'}",
-                        },
-                    )
-                )
-                raise e
+                response_text = await self._attempt_translation(current_messages, model, response_format)
+                # Parse and validate in a single pass with pydantic's Rust JSON parser
+                return schema.model_validate_json(response_text)
+            except ValidationError:
+                # Let the retry decorator request a fresh translation
+                raise
             except Exception as e:
                 last_error = e
                 print(f"Model {model} failed with {repr(e)}, trying next...", flush=True)
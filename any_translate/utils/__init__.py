@@ -1,6 +1,7 @@
 from any_translate.utils.prompt import extract_srt_content as extract_srt_content
 from any_translate.utils.prompt import get_default_system_prompt as get_default_system_prompt
 from any_translate.utils.prompt import get_system_prompt as get_system_prompt
+from any_translate.utils.prompt import get_system_prompt_blocks as get_system_prompt_blocks
 from any_translate.utils.prompt import load_system_prompt_from_file as load_system_prompt_from_file
 from any_translate.utils.srt import is_in_valid_time_range as is_in_valid_time_range
 from any_translate.utils.srt import save_subtitles_to_srt as save_subtitles_to_srt
@@ -1,7 +1,16 @@
-import textwrap
+import functools
 from pathlib import Path
 from typing import Literal
 
+from any_translate.models.prompt import SystemPromptBlock
+
+# Base instructions (common to all languages), kept without indentation so that no dedent is needed
+DEFAULT_SYSTEM_PROMPT_TEMPLATE = (
+    "Translate the input to {target_lang}, keeping context and the original's explicit, dirty and erotic tone.\n"
+    "Choose formal/informal speech from speaker relationships.\n"
+    "Reply with ONLY the requested JSON: no extra fields, comments or explanations."
+)
+
 
 def extract_srt_content(srt_text: str) -> str:
     """
@@ -13,16 +22,17 @@ def extract_srt_content(srt_text: str) -> str:
     Returns:
         Extracted content
     """
-    try:
-        start_index = (
-            srt_text.index("```srt") + len("```srt") if "```srt" in srt_text else srt_text.index("```") + len("```")
-        )
-        end_index = srt_text.index("```", start_index)
-        return srt_text[start_index:end_index].strip()
-    except ValueError:
-        return srt_text
+    # Prefer a block tagged as srt and fall back to the first fenced block
+    _, fence, tail = srt_text.partition("```srt")
+    if not fence:
+        _, fence, tail = srt_text.partition("```")
+        if not fence:
+            return srt_text
+    content, closing_fence, _ = tail.partition("```")
+    return content.strip() if closing_fence else srt_text
 
 
+@functools.lru_cache(maxsize=32)
 def get_default_system_prompt(
     tone: Literal["formal", "informal", "auto-contextual"] = "auto-contextual", target_lang: str = "ko"
 ) -> str:
@@ -36,48 +46,50 @@ def get_default_system_prompt(
     Returns:
         System prompt
     """
+    return DEFAULT_SYSTEM_PROMPT_TEMPLATE.format(target_lang=target_lang)
 
-    # Base instructions (common to all languages)
-    base_instructions = textwrap.dedent(f"""
-        You are an advanced translation assistant. Follow these rules:
-        1. Translate the input text to {target_lang} while maintaining context.
-        2. Determine formal/informal tone based on speaker relationships.
-        3. Always respond in JSON format: {{"source_lang": "EN", "translated_text": "<translated_text>"}}.
-        4. No explanations, only valid JSON.
-        5. NEVER include any additional fields in the JSON response.
-        6. NEVER include any comments or explanations outside the JSON.
 
-        Make sure you keep the original content's explicit, dirty and erotic tone.
-    """).strip()
+def load_system_prompt_from_file(file_path: Path) -> str:
+    """
+    Load system prompt from file
 
-    # Final prompt combination
-    full_prompt = f"{base_instructions}"
+    Args:
+        file_path: Path to the system prompt file
 
-    return full_prompt
+    Returns:
+        System prompt loaded from file
+    """
+    # Keyed on the modification time, so an edited file is read again
+    return _load_system_prompt_file(str(file_path), file_path.stat().st_mtime_ns)
 
 
-def load_system_prompt_from_file(file_path: Path) -> str:
+@functools.lru_cache(maxsize=16)
+def _load_system_prompt_file(file_path: str, mtime_ns: int) -> str:
     """
-    Load system prompt from file
+    Read a system prompt file, caching its content per path and modification time
 
     Args:
         file_path: Path to the system prompt file
+        mtime_ns: Modification time of the file in nanoseconds
 
     Returns:
         System prompt loaded from file
     """
-    with open(file_path, encoding="utf-8") as f:
-        return f.read().strip()
+    return Path(file_path).read_text(encoding="utf-8").strip()
 
 
-def get_system_prompt(
+def get_system_prompt_blocks(
     target_lang: str,
     tone: Literal["formal", "informal", "auto-contextual"] = "auto-contextual",
     system_prompt_file: Path | None = None,
     additional_prompt: str | None = None,
-) -> str:
+) -> list[SystemPromptBlock]:
     """
-    Get system prompt
+    Get system prompt as text blocks, marking the stable base prompt as a prompt cache breakpoint
+
+    The base prompt is sent identically with every request of a job, so providers supporting
+    cache_control can reuse it instead of processing it again. cache_control is an Anthropic-style
+    field: it only works through compatible proxies or endpoints, and the OpenAI API does not support it.
 
     Args:
         target_lang: Target language
@@ -86,14 +98,37 @@ def get_system_prompt(
         additional_prompt: Additional prompt to add after the system prompt
 
     Returns:
-        Complete system prompt
+        System prompt blocks
     """
     if system_prompt_file:
         base_prompt = load_system_prompt_from_file(system_prompt_file)
     else:
         base_prompt = get_default_system_prompt(tone, target_lang)
 
+    blocks: list[SystemPromptBlock] = [{"type": "text", "text": base_prompt, "cache_control": {"type": "ephemeral"}}]
     if additional_prompt:
-        base_prompt = f"{base_prompt}\n\n{additional_prompt}"
+        blocks.append({"type": "text", "text": additional_prompt})
+
+    return blocks
+
 
-    return base_prompt
+def get_system_prompt(
+    target_lang: str,
+    tone: Literal["formal", "informal", "auto-contextual"] = "auto-contextual",
+    system_prompt_file: Path | None = None,
+    additional_prompt: str | None = None,
+) -> str:
+    """
+    Get system prompt
+
+    Args:
+        target_lang: Target language
+        tone: Translation tone
+        system_prompt_file: Path to system prompt file
+        additional_prompt: Additional prompt to add after the system prompt
+
+    Returns:
+        Complete system prompt
+    """
+    blocks = get_system_prompt_blocks(target_lang, tone, system_prompt_file, additional_prompt)
+    return "\n\n".join(block["text"] for block in blocks)
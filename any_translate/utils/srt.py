@@ -1,32 +1,32 @@
-from datetime import datetime
+from collections.abc import Iterable
+from operator import attrgetter
 from pathlib import Path
 
 import pysrt
 
 from any_translate.models.subtitle import Subtitle
 
+# Read SRT files in large chunks to keep the number of read syscalls low on big files
+SRT_READ_BUFFER_SIZE = 1 << 20
 
-def srt_to_subtitles(srt_contents: list[pysrt.SubRipItem]) -> list[Subtitle]:
+# Fetches all fields of a SubRipItem needed for a Subtitle in a single call
+_sub_rip_item_fields = attrgetter("index", "start", "end", "text")
+
+
+def srt_to_subtitles(srt_contents: Iterable[pysrt.SubRipItem]) -> list[Subtitle]:
     """
-    Convert a list of pysrt SubRipItems to a list of Subtitle objects
+    Convert pysrt SubRipItems to a list of Subtitle objects
 
     Args:
-        srt_contents: List of subtitles parsed by pysrt
+        srt_contents: Subtitles parsed by pysrt (a list or a stream of items)
 
     Returns:
         List of Subtitle objects
     """
-    subtitles = []
-    for srt_subtitle in srt_contents:
-        subtitle = Subtitle(
-            index=srt_subtitle.index,
-            start=str(srt_subtitle.start),
-            end=str(srt_subtitle.end),
-            text=srt_subtitle.text,
-        )
-        subtitles.append(subtitle)
-
-    return subtitles
+    return [
+        Subtitle(index=index, start=str(start), end=str(end), text=text)
+        for index, start, end, text in map(_sub_rip_item_fields, srt_contents)
+    ]
 
 
 def srt_file_to_subtitles(file_path: Path) -> list[Subtitle]:
@@ -39,8 +39,10 @@ def srt_file_to_subtitles(file_path: Path) -> list[Subtitle]:
     Returns:
         List of Subtitle objects
     """
-    srt_subtitles_list = pysrt.open(str(file_path), encoding="utf-8")
-    return srt_to_subtitles(srt_subtitles_list)
+    # Stream items from the file instead of loading them into a SubRipFile first
+    # (utf-8-sig also drops a leading BOM, which would otherwise end up in the first index)
+    with open(file_path, encoding="utf-8-sig", buffering=SRT_READ_BUFFER_SIZE) as srt_file:
+        return srt_to_subtitles(pysrt.stream(srt_file))
 
 
 def subtitles_to_srt(subtitles: list[Subtitle]) -> str:
@@ -53,16 +55,22 @@ def subtitles_to_srt(subtitles: list[Subtitle]) -> str:
     Returns:
         SRT format string
     """
-    srt_subtitles: list[pysrt.SubRipItem] = []
-    for subtitle in subtitles:
-        srt_subtitle = pysrt.SubRipItem(
+    # Bind the pysrt lookups locally so that they are not resolved again for every subtitle
+    sub_rip_item = pysrt.SubRipItem
+    time_from_ordinal = pysrt.SubRipTime.from_ordinal
+    # Items are built lazily and rendered one at a time, so no intermediate list of SubRipItems is kept.
+    # Times come from the cached millisecond conversion of the time strings instead of pysrt's regex parser
+    srt_subtitles = (
+        sub_rip_item(
             index=subtitle.index,
-            start=pysrt.SubRipTime.from_string(subtitle.start),
-            end=pysrt.SubRipTime.from_string(subtitle.end),
+            start=time_from_ordinal(subtitle.start_ms),
+            end=time_from_ordinal(subtitle.end_ms),
             text=subtitle.text,
         )
-        srt_subtitles.append(srt_subtitle)
-    return "\n\n".join([str(sub) for sub in srt_subtitles])
+        for subtitle in subtitles
+    )
+    # Terminate every item with a blank line unless it already ends with one, as pysrt does when saving a file
+    return "".join(srt_item if srt_item.endswith("\n\n") else f"{srt_item}\n" for srt_item in map(str, srt_subtitles))
 
 
 def save_subtitles_to_srt(subtitles: list[Subtitle], file_path: Path, reindex: bool = False) -> None:
@@ -74,40 +82,30 @@ def save_subtitles_to_srt(subtitles: list[Subtitle], file_path: Path, reindex: b
         file_path: Path to save the SRT file
         reindex: Whether to reindex the subtitles (default: False)
     """
-    srt_file = pysrt.from_string(subtitles_to_srt(subtitles), encoding="utf-8")
+    srt_text = subtitles_to_srt(subtitles)
     if reindex:
+        srt_file = pysrt.from_string(srt_text, encoding="utf-8")
         srt_file.clean_indexes()
-    srt_file.save(str(file_path), encoding="utf-8")
+        srt_file.save(str(file_path), encoding="utf-8")
+        return
+    # Without reindexing the string is already the final file content, so it is not parsed again
+    file_path.write_text(srt_text, encoding="utf-8")
 
 
-def is_in_valid_time_range(
-    original_time_range: tuple[str, str],
-    translated_time_range: tuple[str, str],
-) -> bool:
+def is_in_valid_time_range(original_subtitle: Subtitle, translated_subtitle: Subtitle) -> bool:
     """
-    Check if the translated time range is within the original time range
+    Check if the translated subtitle's time range is within the original subtitle's time range
+
+    Times are compared in whole seconds, using the cached millisecond conversion of the time strings.
 
     Args:
-        original_time_range: Tuple of (start_time, end_time) for the original subtitle
-        translated_time_range: Tuple of (start_time, end_time) for the translated subtitle
+        original_subtitle: Original subtitle
+        translated_subtitle: Translated subtitle
 
     Returns:
         True if the translated time range is within the original time range, False otherwise
     """
-    original_start, original_end = original_time_range
-    translated_start, translated_end = translated_time_range
-
-    date_format = "%H:%M:%S"
-
-    original_start_date = datetime.strptime(original_start.split(".")[0], date_format)
-    original_end_date = datetime.strptime(original_end.split(".")[0], date_format)
-    translated_start_date = datetime.strptime(translated_start.split(".")[0], date_format)
-    translated_end_date = datetime.strptime(translated_end.split(".")[0], date_format)
-
-    if (
-        original_start_date.time() <= translated_start_date.time()
-        and translated_end_date.time() <= original_end_date.time()
-    ):
-        return True
+    original_start, original_end = original_subtitle.start_ms // 1000, original_subtitle.end_ms // 1000
+    translated_start, translated_end = translated_subtitle.start_ms // 1000, translated_subtitle.end_ms // 1000
 
-    return False
+    return original_start <= translated_start and translated_end <= original_end
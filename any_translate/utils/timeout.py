@@ -1,17 +1,97 @@
 import asyncio
 import functools
+import os
+import queue
+import signal
 import threading
+import time
 from collections.abc import Callable, Coroutine
+from concurrent.futures import Future
 from typing import Any, TypeVar, cast
 
 T = TypeVar("T")
 
+# Future of a call, followed by the method and its positional and keyword arguments
+_WorkItem = tuple[Future[Any], Callable[..., Any], tuple[Any, ...], dict[str, Any]]
+
+
+class _DaemonWorkerPool:
+    """
+    Pool of reusable daemon worker threads
+
+    Unlike ThreadPoolExecutor, whose workers are joined at interpreter exit, a call that never returns
+    after its time limit passed does not keep the process from exiting. Such a call still occupies its
+    worker for good, though: once all max_workers workers are stuck, later calls wait in the queue and
+    every timed call made through the pool fails with TimeoutError.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str) -> None:
+        """
+        Initialize _DaemonWorkerPool
+
+        Args:
+            max_workers: Maximum number of worker threads
+            thread_name_prefix: Prefix of the worker thread names
+        """
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._work_queue: queue.SimpleQueue[_WorkItem] = queue.SimpleQueue()
+        self._idle_workers = threading.Semaphore(0)
+        self._workers: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[..., T], *args, **kwargs) -> Future[T]:
+        """
+        Schedule a call on a worker thread, starting a new worker if none is idle
+
+        Args:
+            func: Method to call
+
+        Returns:
+            Future holding the result of the call
+        """
+        future: Future[T] = Future()
+        self._work_queue.put((future, func, args, kwargs))
+        with self._lock:
+            if not self._idle_workers.acquire(blocking=False) and len(self._workers) < self.max_workers:
+                worker = threading.Thread(
+                    target=self._work, name=f"{self.thread_name_prefix}_{len(self._workers)}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+        return future
+
+    def _work(self) -> None:
+        """Run queued calls forever, reporting their results through their futures"""
+        while True:
+            future, func, args, kwargs = self._work_queue.get()
+            if not future.set_running_or_notify_cancel():
+                self._idle_workers.release()
+                continue
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                # Count the worker as idle before the caller sees the outcome and submits its next call
+                self._idle_workers.release()
+                future.set_exception(e)
+            else:
+                self._idle_workers.release()
+                future.set_result(result)
+            del future, func, args, kwargs
+
+
+# Shared worker threads for timed synchronous calls, reused instead of starting a thread per call
+_executor = _DaemonWorkerPool(max_workers=32, thread_name_prefix="set_timeout")
+
 
 def set_timeout(time_limit: int):
     """
     Decorator to add a time limit to synchronous and asynchronous methods
-    For asynchronous methods, use asyncio.wait_for to set the timeout
-    For synchronous methods, use threading.Thread to set the timeout
+    For asynchronous methods, use asyncio.timeout to set the timeout
+    For synchronous methods, use a SIGALRM timer when called from the main thread on POSIX,
+    otherwise run them on shared daemon worker threads and wait for the result with a timeout
+    (a call that never returns keeps its worker, and at most 32 workers are started).
+    SIGALRM cannot interrupt a blocking C call until it returns to Python, so there the limit is enforced late
 
     Args:
         time_limit: Time limit in seconds
@@ -25,9 +105,9 @@ def set_timeout(time_limit: int):
             @functools.wraps(func)
             async def wrapper_async(*args, **kwargs) -> T:
                 try:
-                    return await asyncio.wait_for(
-                        cast(Callable[..., Coroutine[None, None, T]], func)(*args, **kwargs), timeout=time_limit
-                    )
+                    # Run the coroutine in the current task instead of wrapping it in a new one
+                    async with asyncio.timeout(time_limit):
+                        return await cast(Callable[..., Coroutine[None, None, T]], func)(*args, **kwargs)
                 except TimeoutError:
                     raise TimeoutError(f"Async method exceeded time limit of {time_limit} seconds")
 
@@ -36,28 +116,60 @@ def set_timeout(time_limit: int):
 
             @functools.wraps(func)
             def wrapper_sync(*args, **kwargs) -> T:
-                result: list[Any] = [None]
-                exception: list[Exception | None] = [None]
+                if os.name == "posix" and threading.current_thread() is threading.main_thread():
+                    return _call_with_alarm(cast(Callable[..., T], func), time_limit, *args, **kwargs)
+                future = _executor.submit(cast(Callable[..., T], func), *args, **kwargs)
+                try:
+                    return future.result(timeout=time_limit)
+                except TimeoutError:
+                    if future.done():
+                        # The method finished right after the wait timed out or raised TimeoutError itself,
+                        # so report its own outcome
+                        return future.result()
+                    # The call keeps running in the worker; only drop it if it has not started yet
+                    future.cancel()
+                    raise TimeoutError(f"Sync method exceeded time limit of {time_limit} seconds")
 
-                def target():
-                    try:
-                        result[0] = cast(Callable[..., T], func)(*args, **kwargs)
-                    except Exception as e:
-                        exception[0] = e
+            return wrapper_sync
 
-                thread = threading.Thread(target=target)
-                thread.start()
-                thread.join(time_limit)
+    return decorator
 
-                if thread.is_alive():
-                    thread.daemon = True  # Allow the thread to be terminated when the main thread exits
-                    raise TimeoutError(f"Sync method exceeded time limit of {time_limit} seconds")
 
-                if exception[0]:
-                    raise exception[0]
+def _call_with_alarm(func: Callable[..., T], time_limit: int, *args, **kwargs) -> T:  # noqa: UP047
+    """
+    Call a synchronous method in the current thread, interrupting it with SIGALRM once the time limit passes
 
-                return result[0]
+    A timer that is already running (e.g. from an enclosing timed call) keeps its deadline: if it expires
+    first it is left untouched, otherwise its remaining time is restored afterwards.
 
-            return wrapper_sync
+    Python only runs the signal handler between bytecodes, so a method blocked inside a C call that does not
+    return to the interpreter (e.g. a C extension that never checks for signals) is only interrupted once that
+    call returns. Unlike on a worker thread, the caller is not released at the deadline in that case.
 
-    return decorator
+    Args:
+        func: Method to call
+        time_limit: Time limit in seconds
+
+    Returns:
+        Return value of the method
+    """
+    enclosing_delay, _ = signal.getitimer(signal.ITIMER_REAL)
+    if enclosing_delay and enclosing_delay <= time_limit:
+        # The enclosing timer fires first and already enforces a tighter limit
+        return func(*args, **kwargs)
+
+    def on_alarm(signum: int, frame: object) -> None:
+        raise TimeoutError(f"Sync method exceeded time limit of {time_limit} seconds")
+
+    previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+    started = time.monotonic()
+    previous_delay, previous_interval = signal.setitimer(signal.ITIMER_REAL, time_limit)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+        if previous_delay:
+            # A zero delay would disable the timer, so an overdue enclosing timer fires right away instead
+            remaining = max(previous_delay - (time.monotonic() - started), 1e-6)
+            signal.setitimer(signal.ITIMER_REAL, remaining, previous_interval)
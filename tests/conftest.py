@@ -0,0 +1,90 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Any, cast
+
+import pytest
+from openai import AsyncOpenAI
+
+# The CLI and the services import each other, so the CLI has to be loaded first
+import any_translate.cli  # noqa: F401
+from any_translate.services import translation_service as translation_service_module
+from any_translate.services.translation_service import QUERY_SUFFIX, TranslationService
+
+
+class WordEncoding:
+    """Tokenizer stand-in counting one token per whitespace-separated word"""
+
+    def encode_batch(self, texts: list[str]) -> list[list[str]]:
+        return [text.split() for text in texts]
+
+
+class StubCompletions:
+    """Stand-in for chat.completions that translates "text" to "T:text" and records every request"""
+
+    def __init__(self) -> None:
+        self.requests: list[list[dict[str, Any]]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # Requests wait for this event before answering, which lets tests overlap them
+        self.release = asyncio.Event()
+        self.release.set()
+        # Number of upcoming requests that fail
+        self.failures = 0
+        # Number of upcoming batch requests answered with one translation too few
+        self.short_batches = 0
+
+    @property
+    def originals(self) -> list[str | list[str]]:
+        """Originals of every request: a sentence for single requests, a list of sentences for batches"""
+        return [self._original(messages) for messages in self.requests]
+
+    @staticmethod
+    def _original(messages: list[dict[str, Any]]) -> str | list[str]:
+        query = messages[-1]["content"].removesuffix(QUERY_SUFFIX)
+        if "Originals:\n" in query:
+            return json.loads(query.partition("Originals:\n")[2])
+        return query.partition("Original:\n")[2]
+
+    async def create(self, *, messages: list[dict[str, Any]], **kwargs: Any) -> SimpleNamespace:
+        self.requests.append(messages)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Give other requests the chance to start while this one is in flight
+            await asyncio.sleep(0)
+            await self.release.wait()
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("Request failed")
+            original = self._original(messages)
+            if isinstance(original, list):
+                translations = [{"source_lang": "EN", "translated_text": f"T:{text}"} for text in original]
+                if self.short_batches:
+                    self.short_batches -= 1
+                    translations.pop()
+                content = json.dumps({"translations": translations})
+            else:
+                content = json.dumps({"source_lang": "EN", "translated_text": f"T:{original}"})
+        finally:
+            self.in_flight -= 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture()
+def stub_completions(monkeypatch: pytest.MonkeyPatch) -> StubCompletions:
+    # Count tokens without loading a real tokenizer, which has to be downloaded
+    monkeypatch.setattr(translation_service_module, "get_encoding", WordEncoding)
+    return StubCompletions()
+
+
+@pytest.fixture()
+def stub_client(stub_completions: StubCompletions) -> AsyncOpenAI:
+    return cast(AsyncOpenAI, SimpleNamespace(chat=SimpleNamespace(completions=stub_completions)))
+
+
+@pytest.fixture()
+def translation_service(stub_client: AsyncOpenAI) -> TranslationService:
+    return TranslationService(
+        openai_client=stub_client, model_names=["test-model"], system_prompt="System prompt", target_lang="ko"
+    )
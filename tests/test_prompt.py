@@ -0,0 +1,36 @@
+from any_translate.utils.prompt import get_default_system_prompt, get_system_prompt
+
+
+def test_default_system_prompt_renders_target_language() -> None:
+    # when
+    prompt = get_default_system_prompt("auto-contextual", "ja")
+
+    # then
+    assert "Translate the input to ja," in prompt
+    assert prompt == prompt.strip()
+
+
+def test_default_system_prompt_asks_for_json_only() -> None:
+    # when
+    prompt = get_default_system_prompt("formal", "ko")
+
+    # then
+    assert "Reply with ONLY the requested JSON: no extra fields, comments or explanations." in prompt
+
+
+def test_system_prompt_without_additional_prompt_is_default_prompt() -> None:
+    # when
+    prompt = get_system_prompt("ko")
+
+    # then
+    assert prompt == get_default_system_prompt("auto-contextual", "ko")
+
+
+def test_system_prompt_appends_additional_prompt() -> None:
+    # when
+    prompt = get_system_prompt("en", additional_prompt="Keep honorifics.")
+
+    # then
+    assert prompt == f"{get_default_system_prompt('auto-contextual', 'en')}\n\nKeep honorifics."
+    assert "Translate the input to en," in prompt
+    assert "ONLY the requested JSON" in prompt
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pysrt
+
+from any_translate.models.subtitle import Subtitle
+from any_translate.utils.srt import is_in_valid_time_range, save_subtitles_to_srt, srt_to_subtitles, subtitles_to_srt
+
+
+def test_subtitles_to_srt_matches_pysrt_save_layout(tmp_path: Path) -> None:
+    # given
+    subtitles = [
+        Subtitle(index=1, start="00:00:01,000", end="00:00:02,000", text="Hello"),
+        Subtitle(index=2, start="00:00:03,000", end="00:00:04,000", text=""),
+        Subtitle(index=3, start="00:00:05,000", end="00:00:06,000", text="Ends with a newline\n"),
+        Subtitle(index=4, start="00:00:07,000", end="00:00:08,000", text="World"),
+    ]
+    pysrt_path = tmp_path / "pysrt.srt"
+    pysrt.SubRipFile([
+        pysrt.SubRipItem(
+            index=subtitle.index,
+            start=pysrt.SubRipTime.from_string(subtitle.start),
+            end=pysrt.SubRipTime.from_string(subtitle.end),
+            text=subtitle.text,
+        )
+        for subtitle in subtitles
+    ]).save(str(pysrt_path), encoding="utf-8")
+
+    # when
+    srt_text = subtitles_to_srt(subtitles)
+
+    # then
+    assert srt_text == pysrt_path.read_text(encoding="utf-8")
+
+
+def test_save_subtitles_to_srt_writes_subtitles_to_srt_output(tmp_path: Path) -> None:
+    # given
+    subtitles = [
+        Subtitle(index=1, start="00:00:01,000", end="00:00:02,000", text="Hello"),
+        Subtitle(index=2, start="00:00:03,000", end="00:00:04,000", text=""),
+    ]
+    output_path = tmp_path / "output.srt"
+
+    # when
+    save_subtitles_to_srt(subtitles, output_path)
+
+    # then
+    assert output_path.read_text(encoding="utf-8") == subtitles_to_srt(subtitles)
+
+
+def test_is_in_valid_time_range_compares_seconds() -> None:
+    # given
+    original = Subtitle(index=1, start="00:00:01,000", end="00:00:05,300", text="Hello")
+    inside = Subtitle(index=1, start="00:00:01,500", end="00:00:05,900", text="안녕")
+    outside = Subtitle(index=1, start="00:00:00,900", end="00:00:04,000", text="안녕")
+
+    # when & then
+    assert is_in_valid_time_range(original, inside)
+    assert not is_in_valid_time_range(original, outside)
+
+
+def test_is_in_valid_time_range_follows_updated_times() -> None:
+    # given
+    original = srt_to_subtitles(pysrt.from_string("1\n00:00:01,000 --> 00:00:05,000\nHello\n"))[0]
+    translated = original.model_copy(update={"text": "안녕"})
+    assert is_in_valid_time_range(original, translated)
+
+    # when
+    moved = original.model_copy(update={"start": "00:10:00,000", "end": "00:10:01,000"})
+    translated.start = "00:00:00,000"
+
+    # then
+    assert not is_in_valid_time_range(original, moved)
+    assert not is_in_valid_time_range(original, translated)
+
+
+def test_subtitles_to_srt_writes_updated_times() -> None:
+    # given
+    subtitle = srt_to_subtitles(pysrt.from_string("1\n00:00:01,000 --> 00:00:02,000\nHello\n"))[0]
+
+    # when
+    subtitle.start = "00:10:00,000"
+    moved = subtitle.model_copy(update={"end": "00:10:01,250"})
+
+    # then
+    assert subtitles_to_srt([moved]) == "1\n00:10:00,000 --> 00:10:01,250\nHello\n\n"
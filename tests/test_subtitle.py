@@ -0,0 +1,27 @@
+import json
+
+from any_translate.models.subtitle import Subtitle, subtitles_to_dict, subtitles_to_json
+
+
+def test_subtitles_to_json_round_trips_through_json_loads() -> None:
+    # given
+    subtitles = [
+        Subtitle(index=1, start="00:00:01,000", end="00:00:02,000", text="Hello world"),
+        Subtitle(index=2, start="00:00:03,000", end="00:00:04,500", text='안녕 "세상"'),
+    ]
+
+    # when
+    subtitles_json = subtitles_to_json(subtitles)
+
+    # then
+    assert isinstance(subtitles_json, str)
+    assert json.loads(subtitles_json) == subtitles_to_dict(subtitles)
+    assert [Subtitle.model_validate(item) for item in json.loads(subtitles_json)] == subtitles
+
+
+def test_subtitles_to_json_empty_list() -> None:
+    # when
+    subtitles_json = subtitles_to_json([])
+
+    # then
+    assert json.loads(subtitles_json) == []
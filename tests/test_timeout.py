@@ -0,0 +1,198 @@
+import os
+import signal
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+import pytest
+
+from any_translate.utils import timeout as timeout_module
+from any_translate.utils.timeout import _DaemonWorkerPool, set_timeout
+
+posix_only = pytest.mark.skipif(os.name != "posix", reason="SIGALRM timers are only used on POSIX")
+
+
+def call_off_main_thread(func: Callable[[], Any]) -> Any:
+    """Call a function from a thread other than the main one, where set_timeout uses the worker pool"""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(func).result()
+
+
+def test_worker_pool_reuses_idle_workers() -> None:
+    # given
+    pool = _DaemonWorkerPool(max_workers=4, thread_name_prefix="test")
+
+    # when
+    thread_names = {pool.submit(lambda: threading.current_thread().name).result() for _ in range(10)}
+
+    # then
+    assert thread_names == {"test_0"}
+    assert all(worker.daemon for worker in pool._workers)
+
+
+def test_worker_pool_reports_exceptions() -> None:
+    # given
+    pool = _DaemonWorkerPool(max_workers=1, thread_name_prefix="test")
+
+    def fail() -> None:
+        raise KeyError("missing")
+
+    # when
+    future = pool.submit(fail)
+
+    # then
+    with pytest.raises(KeyError):
+        future.result()
+
+
+def test_worker_pool_queues_calls_while_all_workers_are_busy() -> None:
+    # given
+    pool = _DaemonWorkerPool(max_workers=1, thread_name_prefix="test")
+    release = threading.Event()
+    blocked = pool.submit(release.wait)
+
+    # when
+    queued = pool.submit(lambda: "done")
+
+    # then
+    assert not queued.done()
+    release.set()
+    assert blocked.result() is True
+    assert queued.result() == "done"
+    assert len(pool._workers) == 1
+
+
+def test_sync_method_returns_within_time_limit() -> None:
+    # given
+    @set_timeout(1)
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    # when
+    result = call_off_main_thread(lambda: add(1, 2))
+
+    # then
+    assert result == 3
+
+
+def test_sync_method_exceeding_time_limit_raises_timeout_error() -> None:
+    # given
+    release = threading.Event()
+
+    @set_timeout(1)
+    def hang() -> None:
+        release.wait()
+
+    # when
+    started = time.monotonic()
+    with pytest.raises(TimeoutError, match="Sync method exceeded time limit of 1 seconds"):
+        call_off_main_thread(hang)
+
+    # then
+    assert time.monotonic() - started < 2
+    release.set()
+
+
+def test_sync_method_raising_timeout_error_is_propagated_unchanged() -> None:
+    # given
+    @set_timeout(1)
+    def fail() -> None:
+        raise TimeoutError("inner")
+
+    # when & then
+    with pytest.raises(TimeoutError, match="^inner$"):
+        call_off_main_thread(fail)
+
+
+def test_sync_method_finishing_right_after_the_wait_returns_its_result(monkeypatch: pytest.MonkeyPatch) -> None:
+    # given
+    class LateFuture(Future[str]):
+        """Future that is already done, but whose wait with a timeout still times out"""
+
+        def result(self, timeout: float | None = None) -> str:
+            if timeout is not None:
+                raise TimeoutError
+            return super().result()
+
+    class LatePool:
+        def submit(self, func: Callable[..., str], *args: Any, **kwargs: Any) -> Future[str]:
+            future = LateFuture()
+            future.set_result(func(*args, **kwargs))
+            return future
+
+    monkeypatch.setattr(timeout_module, "_executor", LatePool())
+
+    @set_timeout(1)
+    def finish() -> str:
+        return "finished"
+
+    # when
+    result = call_off_main_thread(finish)
+
+    # then
+    assert result == "finished"
+
+
+@posix_only
+def test_sync_method_on_main_thread_is_interrupted_at_time_limit() -> None:
+    # given
+    @set_timeout(1)
+    def sleep() -> None:
+        time.sleep(5)
+
+    previous_handler = signal.getsignal(signal.SIGALRM)
+
+    # when
+    started = time.monotonic()
+    with pytest.raises(TimeoutError, match="Sync method exceeded time limit of 1 seconds"):
+        sleep()
+
+    # then
+    assert time.monotonic() - started < 2
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+    assert signal.getsignal(signal.SIGALRM) == previous_handler
+
+
+@posix_only
+def test_enclosing_deadline_still_fires_after_inner_timed_call_returns() -> None:
+    # given
+    @set_timeout(1)
+    def inner() -> str:
+        return "inner"
+
+    @set_timeout(2)
+    def outer() -> None:
+        assert inner() == "inner"
+        time.sleep(5)
+
+    # when
+    started = time.monotonic()
+    with pytest.raises(TimeoutError, match="Sync method exceeded time limit of 2 seconds"):
+        outer()
+
+    # then
+    assert 1.5 < time.monotonic() - started < 3
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+
+@posix_only
+def test_enclosing_deadline_wins_over_longer_inner_time_limit() -> None:
+    # given
+    @set_timeout(3)
+    def inner() -> None:
+        time.sleep(5)
+
+    @set_timeout(1)
+    def outer() -> None:
+        inner()
+
+    # when
+    started = time.monotonic()
+    with pytest.raises(TimeoutError, match="Sync method exceeded time limit of 1 seconds"):
+        outer()
+
+    # then
+    assert time.monotonic() - started < 2
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
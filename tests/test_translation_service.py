@@ -0,0 +1,219 @@
+import asyncio
+
+import pytest
+from openai import AsyncOpenAI
+
+from any_translate.services.translation_service import TranslationService
+from any_translate.utils.prompt import get_system_prompt, get_system_prompt_blocks
+from tests.conftest import StubCompletions
+
+
+async def test_identical_sentences_share_a_single_request(
+    translation_service: TranslationService, stub_completions: StubCompletions
+) -> None:
+    # given
+    stub_completions.release.clear()
+
+    # when
+    pending = asyncio.gather(
+        translation_service.translate_sentence("Hello"),
+        translation_service.translate_batch(["Hello", "World", "World"]),
+        translation_service.translate_batch(["World", "Hello"]),
+        translation_service.translate_batch(["Bye", "See you", "Bye"]),
+    )
+    await asyncio.sleep(0)
+    stub_completions.release.set()
+    results = await pending
+
+    # then
+    assert stub_completions.originals == ["Hello", "World", ["Bye", "See you"]]
+    assert results[0]["translated_text"] == "T:Hello"
+    assert [result["translated_text"] for result in results[1]] == ["T:Hello", "T:World", "T:World"]
+    assert [result["translated_text"] for result in results[2]] == ["T:World", "T:Hello"]
+    assert [result["translated_text"] for result in results[3]] == ["T:Bye", "T:See you", "T:Bye"]
+
+
+async def test_cached_translation_is_not_requested_again(
+    translation_service: TranslationService, stub_completions: StubCompletions
+) -> None:
+    # given
+    await translation_service.translate_batch(["Hello", "World"])
+
+    # when
+    results = await translation_service.translate_batch(["World", "Hello"])
+
+    # then
+    assert len(stub_completions.requests) == 1
+    assert [result["translated_text"] for result in results] == ["T:World", "T:Hello"]
+
+
+async def test_failed_translation_is_evicted_and_retried(
+    translation_service: TranslationService, stub_completions: StubCompletions
+) -> None:
+    # given
+    stub_completions.failures = 1
+    with pytest.raises(RuntimeError):
+        await translation_service.translate_sentence("Hello")
+
+    # when
+    result = await translation_service.translate_sentence("Hello")
+
+    # then
+    assert result["translated_text"] == "T:Hello"
+    assert stub_completions.originals == ["Hello", "Hello"]
+
+
+async def test_failed_batch_is_evicted_and_retried(
+    translation_service: TranslationService, stub_completions: StubCompletions
+) -> None:
+    # given
+    stub_completions.failures = 1
+    with pytest.raises(RuntimeError):
+        await translation_service.translate_batch(["Hello", "World"])
+
+    # when
+    results = await translation_service.translate_batch(["Hello", "World"])
+
+    # then
+    assert [result["translated_text"] for result in results] == ["T:Hello", "T:World"]
+    assert stub_completions.originals == [["Hello", "World"], ["Hello", "World"]]
+
+
+async def test_cancelled_caller_does_not_cancel_shared_translation(
+    translation_service: TranslationService, stub_completions: StubCompletions
+) -> None:
+    # given
+    stub_completions.release.clear()
+    cancelled_caller = asyncio.create_task(translation_service.translate_sentence("Hello"))
+    other_caller = asyncio.create_task(translation_service.translate_sentence("Hello"))
+    await asyncio.sleep(0)
+
+    # when
+    cancelled_caller.cancel()
+    stub_completions.release.set()
+
+    # then
+    assert (await other_caller)["translated_text"] == "T:Hello"
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled_caller
+    assert (await translation_service.translate_sentence("Hello"))["translated_text"] == "T:Hello"
+    assert stub_completions.originals == ["Hello"]
+
+
+async def test_results_keep_input_order_across_token_budget_groups(
+    stub_client: AsyncOpenAI, stub_completions: StubCompletions
+) -> None:
+    # given
+    translation_service = TranslationService(
+        openai_client=stub_client,
+        model_names=["test-model"],
+        system_prompt="System prompt",
+        target_lang="ko",
+        max_tokens=4,
+    )
+    sentences = ["one two", "three four five", "one two", "six", "seven eight nine ten eleven", "six"]
+
+    # when
+    results = await translation_service.translate_batch(sentences)
+
+    # then
+    assert translation_service.split_by_token_budget(list(dict.fromkeys(sentences))) == [
+        ["one two"],
+        ["three four five", "six"],
+        ["seven eight nine ten eleven"],
+    ]
+    assert [result["translated_text"] for result in results] == [f"T:{sentence}" for sentence in sentences]
+    assert len(stub_completions.requests) == 3
+
+
+async def test_token_budget_groups_are_requested_one_at_a_time(
+    stub_client: AsyncOpenAI, stub_completions: StubCompletions
+) -> None:
+    # given
+    translation_service = TranslationService(
+        openai_client=stub_client,
+        model_names=["test-model"],
+        system_prompt="System prompt",
+        target_lang="ko",
+        max_tokens=4,
+    )
+    sentences = ["one two three", "four five six", "seven eight", "nine"]
+
+    # when
+    results = await translation_service.translate_batch(sentences)
+
+    # then
+    assert stub_completions.originals == ["one two three", "four five six", ["seven eight", "nine"]]
+    assert stub_completions.max_in_flight == 1
+    assert [result["translated_text"] for result in results] == [f"T:{sentence}" for sentence in sentences]
+
+
+async def test_failed_group_does_not_fail_the_following_groups(
+    stub_client: AsyncOpenAI, stub_completions: StubCompletions
+) -> None:
+    # given
+    translation_service = TranslationService(
+        openai_client=stub_client,
+        model_names=["test-model"],
+        system_prompt="System prompt",
+        target_lang="ko",
+        max_tokens=4,
+    )
+    stub_completions.failures = 1
+    with pytest.raises(RuntimeError):
+        await translation_service.translate_batch(["one two three", "four five six"])
+
+    # when
+    results = await translation_service.translate_batch(["four five six"])
+
+    # then
+    assert results[0]["translated_text"] == "T:four five six"
+    assert len(stub_completions.requests) == 2
+
+
+async def test_batch_with_wrong_translation_count_falls_back_to_single_sentences(
+    translation_service: TranslationService, stub_completions: StubCompletions
+) -> None:
+    # given
+    stub_completions.short_batches = 1
+
+    # when
+    results = await translation_service.translate_batch(["Hello", "World", "Bye"])
+
+    # then
+    assert stub_completions.originals == [["Hello", "World", "Bye"], "Hello", "World", "Bye"]
+    assert [result["translated_text"] for result in results] == ["T:Hello", "T:World", "T:Bye"]
+
+
+async def test_system_prompt_is_sent_as_plain_string_by_default(
+    stub_client: AsyncOpenAI, stub_completions: StubCompletions
+) -> None:
+    # given
+    system_prompt = get_system_prompt("ko", additional_prompt="Keep honorifics.")
+    translation_service = TranslationService(
+        openai_client=stub_client, model_names=["test-model"], system_prompt=system_prompt, target_lang="ko"
+    )
+
+    # when
+    await translation_service.translate_sentence("Hello")
+
+    # then
+    assert stub_completions.requests[0][0] == {"role": "system", "content": system_prompt}
+
+
+async def test_system_prompt_blocks_are_sent_with_cache_control(
+    stub_client: AsyncOpenAI, stub_completions: StubCompletions
+) -> None:
+    # given
+    system_prompt_blocks = get_system_prompt_blocks("ko", additional_prompt="Keep honorifics.")
+    translation_service = TranslationService(
+        openai_client=stub_client, model_names=["test-model"], system_prompt=system_prompt_blocks, target_lang="ko"
+    )
+
+    # when
+    await translation_service.translate_sentence("Hello")
+
+    # then
+    system_content = stub_completions.requests[0][0]["content"]
+    assert system_content[0]["cache_control"] == {"type": "ephemeral"}
+    assert system_content[1] == {"type": "text", "text": "Keep honorifics."}